@@ -16,6 +16,7 @@ import datetime
 import json
 import os
 import sys
+import zlib
 from typing import Dict, List, Optional, Union
 
 try:
@@ -171,8 +172,9 @@ def create_bin_calendar(
                 alarm = create_alarm(trigger_before=alarm_time)
                 event.add_component(alarm)
         
-        # Generate a unique ID for the event
-        event_id = f"bin-collection-{collection_date.isoformat()}-{hash(bin_types_str) % 10000:04d}@ukbincollection"
+        # Generate a unique ID for the event. crc32 is cheap and, unlike hash(),
+        # stable across runs so re-imported calendars update rather than duplicate.
+        event_id = f"bin-collection-{collection_date.isoformat()}-{zlib.crc32(bin_types_str.encode()):08x}@ukbincollection"
         event.add('uid', event_id)
         
         # Add the event to the calendar
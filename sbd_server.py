@@ -1,54 +1,404 @@
 from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, Response
+from fastapi.middleware.gzip import GZipMiddleware
+from pydantic import BaseModel, Field
 from typing import Optional
+from contextlib import asynccontextmanager
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
 import uvicorn
-import importlib
-import json
+import asyncio
+import atexit
+import functools
+import importlib.util
+import orjson
 import os
 import sys
 import logging
-import subprocess
+import multiprocessing
+import queue
+from logging.handlers import QueueHandler, QueueListener
 import re
 import time
+from pathlib import Path
+from collections import deque
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
+from cachetools import TTLCache
 
-# Set up logging
-logging.basicConfig(level=logging.INFO)
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+try:
+    from uk_bin_collection.uk_bin_collection.collect_data import UKBinCollectionApp
+except ImportError:
+    UKBinCollectionApp = None
+
+from scraper_worker import SCRAPER_INPUT_ERRORS, ScraperInputError, preload_scraper, run_collect_data
+
+# Set up logging. Handlers only enqueue records; a background listener thread
+# writes them, keeping stream I/O off the event loop. The QueueHandler formats
+# each record (with basicConfig's format) before enqueueing it, so arguments
+# are rendered as they were at the time of the logging call and the listener
+# just writes the finished line.
+LOG_QUEUE = queue.SimpleQueue()
+LOG_LISTENER = QueueListener(LOG_QUEUE, logging.StreamHandler())
+LOG_LISTENER.start()
+atexit.register(LOG_LISTENER.stop)
+logging.basicConfig(level=logging.INFO, handlers=[QueueHandler(LOG_QUEUE)])
 logger = logging.getLogger("sbd_server")
 
 # --- GLOBAL CACHE ---
-# Stores bin data in memory to make ICS/Calendar requests instant.
-BIN_CACHE = {}
+# Stores bin data to make ICS/Calendar requests instant. When REDIS_URL is set
+# (and the 'redis' package is installed) entries live in Redis so every worker
+# and restart shares them; otherwise they are kept in these bounded in-memory
+# TTL caches, which evict expired and least-recently-used entries themselves.
 CACHE_DURATION = 86400  # 24 Hours
+PUBLIC_ADDRESS_CACHE_DURATION = 10800  # 3 Hours
+OS_ADDRESS_CACHE_DURATION = 86400  # 24 Hours
+BIN_CACHE = TTLCache(maxsize=10_000, ttl=CACHE_DURATION)
+PUBLIC_ADDRESS_CACHE = TTLCache(maxsize=5_000, ttl=PUBLIC_ADDRESS_CACHE_DURATION)
+OS_ADDRESS_CACHE = TTLCache(maxsize=5_000, ttl=OS_ADDRESS_CACHE_DURATION)
+
+REDIS_URL = os.environ.get("REDIS_URL")
+redis_client = None
+if REDIS_URL:
+    if aioredis is not None:
+        redis_client = aioredis.Redis.from_url(REDIS_URL)
+        logger.info("Using Redis for the shared bin/address cache.")
+    else:
+        logger.warning("REDIS_URL is set but the 'redis' package is not installed. Falling back to in-memory cache.")
+
+# Upper bound on free-text address input (URL + UPRN + postcode + house name
+# comfortably fits). Anything longer is rejected before any upstream call.
+MAX_ADDRESS_LENGTH = 512
+# A UK postcode is at most 8 characters with its space; leave room for stray
+# whitespace. This also bounds the keys of no_addresses_body's cache.
+MAX_POSTCODE_LENGTH = 16
+
+# --- PATTERNS ---
+# Compiled once at import rather than on every request.
+# UK postcode: the four outward-code shapes (A9, A99, AA9, AA99, A9A, AA9A)
+# folded into one optional-letter / optional-char form, so no nested groups
+# to backtrack through.
+POSTCODE_PATTERN = r'GIR 0AA|[A-Z][A-HJ-Y]?[0-9][0-9A-Z]?\s?[0-9][A-Z]{2}'
+# Classifies every URL, UPRN (standalone 8-12 digits) and postcode in a
+# /get_bins input in a single pass; m.lastgroup names the kind.
+INPUT_TOKEN_RE = re.compile(
+    r'(?P<url>https?://\S+)|(?P<uprn>\b\d{8,12}\b)|(?P<postcode>' + POSTCODE_PATTERN + r')',
+    re.IGNORECASE,
+)
+UPRN_HREF_RE = re.compile(r'\d{8,12}')
+# uprn.uk address links: the only part of a postcode page that gets parsed
+UPRN_LINKS = SoupStrainer('a', href=re.compile('/uprn/'))
+WS_RE = re.compile(r'\s+')
+CAMEL_RE = re.compile(r'(?<!^)(?=[A-Z])')
+
+# --- HTTP SESSION ---
+# Shared across all outbound lookups so repeat calls to uprn.uk, api.os.uk and
+# council APIs reuse pooled keep-alive connections instead of a new TLS
+# handshake per request. A standard API's /services call and its concurrent
+# detail fetches all go to one host, so pool_maxsize bounds that fan-out too.
+SESSION = requests.Session()
+SESSION.headers.update({
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Connection': 'keep-alive',
+})
+# Retries cover connection errors only. urllib3 would otherwise also retry a
+# 429/503 carrying Retry-After, sleeping as long as told, under limited_get's
+# own (capped) 429 handling.
+_adapter = HTTPAdapter(
+    pool_connections=20, pool_maxsize=50,
+    max_retries=Retry(total=2, backoff_factor=0.3, respect_retry_after_header=False),
+)
+SESSION.mount('https://', _adapter)
+SESSION.mount('http://', _adapter)
 
 # --- PATH FINDER ---
-current_dir = os.getcwd()
-collect_data_path = None
-for root, dirs, files in os.walk(current_dir):
-    if "collect_data.py" in files:
-        collect_data_path = os.path.join(root, "collect_data.py")
-        break
+# Resolved once at startup; no request handler walks the filesystem. The
+# import system locates the package directly; only when it is not importable
+# do we fall back to a bounded search of the working directory.
+ROOT = Path.cwd()
+
+def find_spec_path(name):
+    """
+    Returns the file (module) or directory (package) the import system
+    resolves name to, or None if it cannot be found.
+    """
+    try:
+        spec = importlib.util.find_spec(name)
+    except (ImportError, ValueError):
+        return None
+    if spec is None:
+        return None
+    if spec.submodule_search_locations:
+        return Path(next(iter(spec.submodule_search_locations)))
+    return Path(spec.origin) if spec.origin else None
+
+# Directories never worth descending into when searching the working tree
+SEARCH_SKIP_DIRS = {"node_modules", "venv", "__pycache__", "site-packages"}
+
+def search_tree(name, is_match, root=ROOT, max_depth=4):
+    """
+    Breadth-first search under root for an entry called name that satisfies
+    is_match(DirEntry). Hidden and SEARCH_SKIP_DIRS directories are pruned and
+    the search stops at max_depth, so a large checkout or virtualenv in the
+    working directory cannot make startup crawl.
+    """
+    pending = deque([(root, 0)])
+    while pending:
+        path, depth = pending.popleft()
+        try:
+            with os.scandir(path) as entries:
+                entries = list(entries)
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.name == name and is_match(entry):
+                return Path(entry.path)
+        if depth < max_depth:
+            pending.extend(
+                (entry.path, depth + 1) for entry in entries
+                if entry.is_dir(follow_symlinks=False)
+                and not entry.name.startswith(".") and entry.name not in SEARCH_SKIP_DIRS
+            )
+    return None
+
+def has_modules(entry):
+    """
+    True for a directory containing at least one .py module.
+    """
+    return entry.is_dir() and any(p.suffix == ".py" for p in Path(entry.path).iterdir())
+
+collect_data_path = (
+    find_spec_path("uk_bin_collection.uk_bin_collection.collect_data")
+    or search_tree("collect_data.py", lambda entry: entry.is_file())
+)
 
 if collect_data_path:
-    logger.info(f"Found collect_data.py at: {collect_data_path}")
+    logger.info("Found collect_data.py at: %s", collect_data_path)
 else:
     logger.error("CRITICAL: Could not find collect_data.py")
 
-app = FastAPI()
+def find_councils_dir():
+    """
+    Locates the council modules folder through the import system. Failing
+    that it is looked for next to collect_data.py, and then as the first
+    'councils' folder holding modules under the working directory.
+    """
+    candidate = find_spec_path("uk_bin_collection.uk_bin_collection.councils")
+    if candidate and candidate.is_dir():
+        return candidate
+    if collect_data_path:
+        candidate = collect_data_path.parent / "councils"
+        if candidate.is_dir():
+            return candidate
+    return search_tree("councils", has_modules)
+
+councils_path = find_councils_dir()
+
+# Sorted council display names, the encoded /get_councils body, and a
+# lower-cased name -> module name table for /get_bins, keyed on the councils
+# folder's mtime so an added/removed module is picked up without re-listing
+# (or re-encoding) on every request.
+COUNCILS_CACHE = {"mtime": None, "data": [], "body": b'{"councils":[]}', "modules": {}}
+
+def list_councils():
+    """
+    Returns the cached council list, re-reading the councils folder only
+    when its mtime has changed.
+    """
+    mtime = councils_path.stat().st_mtime_ns
+    if mtime != COUNCILS_CACHE["mtime"]:
+        # scandir's dirent type info avoids a stat (and a Path object) per file;
+        # the names and the splitter are bound once, outside the loop
+        sub = CAMEL_RE.sub
+        with os.scandir(councils_path) as entries:
+            modules = [
+                name[:-3] for e in entries
+                if (name := e.name).endswith(".py") and not name.startswith("__") and e.is_file(follow_symlinks=False)
+            ]
+        COUNCILS_CACHE["data"] = sorted(sub(' ', m) for m in modules)
+        COUNCILS_CACHE["modules"] = {m.lower(): m for m in modules}
+        COUNCILS_CACHE["body"] = orjson.dumps({"councils": COUNCILS_CACHE["data"]})
+        COUNCILS_CACHE["mtime"] = mtime
+    return COUNCILS_CACHE["data"]
+
+def resolve_module(module):
+    """
+    Maps a requested council, as a display name ("Wiltshire Council") or
+    module name, to its module name; None if there is no such council. The
+    folder is only re-checked on a miss, in case a module was just added.
+    """
+    key = module.replace(" ", "").lower()
+    found = COUNCILS_CACHE["modules"].get(key)
+    if found is None and councils_path:
+        list_councils()
+        found = COUNCILS_CACHE["modules"].get(key)
+    return found
+
+if councils_path:
+    logger.info("Loaded %s councils from: %s", len(list_councils()), councils_path)
+else:
+    logger.error("Could not locate 'councils' folder.")
+
+if UKBinCollectionApp is None:
+    logger.warning("Could not import collect_data in-process. Scrapers will run as subprocesses.")
+
+@asynccontextmanager
+async def lifespan(app):
+    start_scraper_pool()
+    yield
+    if SCRAPER_POOL is not None:
+        SCRAPER_POOL.shutdown(wait=False, cancel_futures=True)
+    if redis_client is not None:
+        await redis_client.aclose()
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSONResponse encoded with orjson. FastAPI's own ORJSONResponse is
+    deprecated, and our routes return plain dicts (no response_model), so
+    they would otherwise fall back to the stdlib json encoder.
+    """
+    def render(self, content):
+        return orjson.dumps(content)
+
+# orjson handles both the scraper output parsing and response encoding
+app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
+# /get_councils (every council name) and large bin lists compress well
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 class BinRequest(BaseModel):
-    address_data: str
+    address_data: str = Field(..., max_length=MAX_ADDRESS_LENGTH)
     module: str
     os_api_key: Optional[str] = None
 
 class AddressRequest(BaseModel):
-    postcode: str
+    postcode: str = Field(..., max_length=MAX_POSTCODE_LENGTH)
     module: str
     os_api_key: Optional[str] = None
 
+def make_cache_key(module_name, input_l):
+    """
+    Builds the BIN_CACHE key for a (module, lowercased address) pair.
+    Whitespace is normalised so that repeat lookups from the same
+    household ("BA14 8JN" / "ba14  8jn") share a single entry.
+    """
+    return f"bins:{module_name}:{' '.join(input_l.split())}"
+
+async def cache_get(store, key):
+    """
+    Returns the cached value for key, or None on a miss / expired entry.
+    Reads from Redis when configured, otherwise from the given TTLCache.
+    """
+    if redis_client is not None:
+        try:
+            raw = await redis_client.get(key)
+        except Exception as e:
+            logger.warning("REDIS GET ERROR: %s", e)
+            return None
+        return orjson.loads(raw) if raw else None
+
+    return store.get(key)
+
+async def cache_set(store, key, data, ttl):
+    """
+    Stores data under key for ttl seconds in Redis, or in the given TTLCache
+    (which applies its own ttl).
+    """
+    if redis_client is not None:
+        try:
+            await redis_client.setex(key, ttl, orjson.dumps(data))
+        except Exception as e:
+            logger.warning("REDIS SET ERROR: %s", e)
+        return
+
+    store[key] = data
+
+# --- OUTBOUND RATE LIMITING ---
+# uprn.uk and OS Places throttle (or block) bursty clients, so address lookups
+# are paced per worker instead of firing one GET per concurrent request.
+class RateLimiter:
+    """
+    Async token bucket allowing `rate` acquisitions per `period` seconds,
+    with bursts of up to `rate`.
+    """
+    def __init__(self, rate, period=1.0):
+        self.rate = rate
+        self.period = period
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = None  # created lazily, inside the running event loop
+
+    async def __aenter__(self):
+        if self.lock is None:
+            self.lock = asyncio.Lock()
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate / self.period)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return self
+                await asyncio.sleep((1 - self.tokens) * self.period / self.rate)
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+PUBLIC_LIMITER = RateLimiter(5, 1)
+OS_LIMITER = RateLimiter(20, 1)
+MAX_RETRY_AFTER = 10  # seconds
+
+async def limited_get(limiter, url, **kwargs):
+    """
+    GETs url on the shared SESSION once the limiter allows it. A 429 is
+    retried once, after the upstream's Retry-After delay (capped).
+    """
+    for attempt in range(2):
+        async with limiter:
+            response = await asyncio.to_thread(SESSION.get, url, **kwargs)
+        if response.status_code != 429 or attempt:
+            return response
+        try:
+            delay = min(float(response.headers.get("Retry-After", 2)), MAX_RETRY_AFTER)
+        except ValueError:
+            delay = 2
+        logger.warning("RATE LIMITED: %s returned 429, retrying in %ss", url, delay)
+        await asyncio.sleep(delay)
+
+
 # --- ADDRESS LOOKUP ENGINE ---
-def fetch_public_addresses(postcode):
+# The requests/BeautifulSoup calls here block, so they run via
+# asyncio.to_thread and a slow upstream never stalls the event loop for other
+# clients.
+def parse_public_addresses(html):
+    """
+    Extracts address-to-UPRN mappings from a uprn.uk postcode page.
+    """
+    results = []
+    # Only UPRN links are of interest - build just those, not the whole page
+    soup = BeautifulSoup(html, 'lxml', parse_only=UPRN_LINKS)
+    for link in soup.find_all('a'):
+        uprn_match = UPRN_HREF_RE.search(link['href'])
+        if uprn_match:
+            uprn = uprn_match.group(0)
+            # Clean up address text
+            address_text = link.get_text().strip()
+            address_text = WS_RE.sub(' ', address_text) # Remove extra whitespace
+            
+            results.append({
+                "uprn": uprn,
+                "address": address_text
+            })
+    return results
+
+async def fetch_public_addresses(postcode):
     """
     Scrapes a public directory (uprn.uk) to return a list of 
     address-to-UPRN mappings for a given postcode.
@@ -58,40 +408,22 @@ def fetch_public_addresses(postcode):
     try:
         clean_pc = postcode.replace(" ", "").strip()
         url = f"https://www.uprn.uk/addresses/{clean_pc}"
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
         
-        logger.info(f"PUBLIC LOOKUP: Fetching address list for {clean_pc}")
-        response = requests.get(url, headers=headers, timeout=5)
+        logger.info("PUBLIC LOOKUP: Fetching address list for %s", clean_pc)
+        response = await limited_get(PUBLIC_LIMITER, url, timeout=5)
         
         if response.status_code == 200:
-            soup = BeautifulSoup(response.text, 'html.parser')
-            # Find all links that might be UPRN links
-            links = soup.find_all('a', href=True)
-            for link in links:
-                href = link['href']
-                # Check for UPRN link pattern
-                if "/uprn/" in href:
-                    uprn_match = re.search(r'\d{8,12}', href)
-                    if uprn_match:
-                        uprn = uprn_match.group(0)
-                        # Clean up address text
-                        address_text = link.get_text().strip()
-                        address_text = re.sub(r'\s+', ' ', address_text) # Remove extra whitespace
-                        
-                        results.append({
-                            "uprn": uprn,
-                            "address": address_text
-                        })
-            logger.info(f"PUBLIC LOOKUP: Found {len(results)} addresses.")
+            results = await asyncio.to_thread(parse_public_addresses, response.text)
+            logger.info("PUBLIC LOOKUP: Found %s addresses.", len(results))
         else:
-            logger.warning(f"PUBLIC LOOKUP: Failed to fetch page. Status: {response.status_code}")
+            logger.warning("PUBLIC LOOKUP: Failed to fetch page. Status: %s", response.status_code)
             
     except Exception as e:
-        logger.error(f"PUBLIC LOOKUP ERROR: {e}")
+        logger.error("PUBLIC LOOKUP ERROR: %s", e)
         
     return results
 
-def fetch_os_places_addresses(postcode, api_key):
+async def fetch_os_places_addresses(postcode, api_key):
     """
     Queries the Ordnance Survey Places API for addresses.
     Requires a valid API Key.
@@ -106,78 +438,188 @@ def fetch_os_places_addresses(postcode, api_key):
             "dataset": "DPA,LPI" # Query both AddressBase Premium and Local Property Identifier
         }
         
-        logger.info(f"OS API LOOKUP: Querying OS Places API for {postcode}")
-        response = requests.get(url, params=params, timeout=10)
+        logger.info("OS API LOOKUP: Querying OS Places API for %s", postcode)
+        response = await limited_get(OS_LIMITER, url, params=params, timeout=10)
         
         if response.status_code == 200:
-            data = response.json()
+            data = orjson.loads(response.content)
             if "results" in data:
-                for item in data["results"]:
-                    # The API returns a wrapper object, usually 'DPA' or 'LPI'
-                    address_data = item.get("DPA") or item.get("LPI")
-                    if address_data:
-                        uprn = address_data.get("UPRN")
-                        address = address_data.get("ADDRESS")
-                        if uprn and address:
-                            results.append({
-                                "uprn": uprn,
-                                "address": address
-                            })
-                logger.info(f"OS API LOOKUP: Found {len(results)} addresses.")
+                # The API returns a wrapper object, usually 'DPA' or 'LPI'. Only
+                # UPRN + ADDRESS are kept; geometry/classification are dropped.
+                results = [
+                    {"uprn": address_data["UPRN"], "address": address_data["ADDRESS"]}
+                    for item in data["results"]
+                    if (address_data := item.get("DPA") or item.get("LPI"))
+                    and address_data.get("UPRN") and address_data.get("ADDRESS")
+                ]
+                logger.info("OS API LOOKUP: Found %s addresses.", len(results))
             else:
                 logger.info("OS API LOOKUP: No results found in response.")
         elif response.status_code == 401:
              logger.error("OS API LOOKUP: Invalid API Key.")
              return [{"uprn": "error", "address": "Error: Invalid OS API Key provided."}]
         else:
-            logger.warning(f"OS API LOOKUP: Request failed. Status: {response.status_code} - {response.text}")
+            logger.warning("OS API LOOKUP: Request failed. Status: %s - %s", response.status_code, response.text)
             
     except Exception as e:
-        logger.error(f"OS API LOOKUP ERROR: {e}")
+        logger.error("OS API LOOKUP ERROR: %s", e)
         return [{"uprn": "error", "address": f"OS API Error: {str(e)}"}]
         
     return results
 
-def lookup_uprn_public(postcode, house_identifier):
+# --- REQUEST COALESCING ---
+# Futures for upstream calls currently in flight, keyed like the cache. A
+# burst of identical requests waits on the first caller instead of issuing
+# duplicate GETs / scrapes.
+INFLIGHT = {}
+
+async def single_flight(key, func):
+    """
+    Awaits func() at most once per key at a time. Concurrent callers with the
+    same key share the leader's result (or exception). If the leader is
+    cancelled (its client went away), a waiting caller takes over and runs
+    func() itself.
+    """
+    while True:
+        fut = INFLIGHT.get(key)
+        if fut is None:
+            break
+        # wait() rather than shield(): a cancelled leader must not look like
+        # this caller being cancelled, and cancelling this caller leaves fut be
+        await asyncio.wait([fut])
+        if not fut.cancelled():
+            return fut.result()
+
+    fut = asyncio.get_running_loop().create_future()
+    INFLIGHT[key] = fut
+    try:
+        result = await func()
+    except asyncio.CancelledError:
+        fut.cancel()
+        raise
+    except Exception as e:
+        fut.set_exception(e)
+        fut.exception()  # mark retrieved; followers still receive it
+        raise
+    else:
+        fut.set_result(result)
+        return result
+    finally:
+        INFLIGHT.pop(key, None)
+
+def postcode_cache_key(source, postcode):
+    return f"addresses:{source}:{postcode.replace(' ', '').upper()}"
+
+def leading_token(text):
+    """
+    First word of an address or house identifier, lowercased and without
+    trailing punctuation ("1, HIGH STREET" -> "1").
+    """
+    parts = text.lower().split(maxsplit=1)
+    return parts[0].rstrip(",.") if parts else ""
+
+def index_addresses(results):
+    """
+    Wraps an address list with an index grouped by leading token (usually
+    the house number or name), built once per fetch and cached alongside it.
+    The list's JSON body for /get_addresses is encoded once here too, as a
+    str so the entry still round-trips through Redis.
+    """
+    by_leading = {}
+    for item in results:
+        by_leading.setdefault(leading_token(item["address"]), []).append(item)
+    return {"list": results, "by_leading": by_leading, "body": orjson.dumps(results).decode()}
+
+def match_address(addresses, house_identifier):
+    """
+    Returns the first address containing house_identifier. Addresses that
+    start with the identifier's first word are tried first; the full list is
+    only scanned if none of those match. A bare house number has to match a
+    whole number, so "1" finds "1 High Street" but not "10 High Street".
+    """
+    target = house_identifier.casefold()
+    if target.isdigit():
+        matches = re.compile(rf'(?<!\d){target}(?!\d)').search
+    else:
+        matches = lambda address: target in address
+    for candidates in (addresses["by_leading"].get(leading_token(target), []), addresses["list"]):
+        for item in candidates:
+            if matches(item["address"].casefold()):
+                return item
+    return None
+
+async def get_public_addresses(postcode):
+    """
+    Cached wrapper around fetch_public_addresses. Empty results are not
+    cached so a transient uprn.uk failure is retried on the next request.
+    """
+    key = postcode_cache_key("public", postcode)
+    addresses = await cache_get(PUBLIC_ADDRESS_CACHE, key)
+    if addresses is not None:
+        return addresses
+
+    async def fetch():
+        results = index_addresses(await fetch_public_addresses(postcode))
+        if results["list"]:
+            await cache_set(PUBLIC_ADDRESS_CACHE, key, results, PUBLIC_ADDRESS_CACHE_DURATION)
+        return results
+
+    return await single_flight(key, fetch)
+
+async def get_os_places_addresses(postcode, api_key):
+    """
+    Cached wrapper around fetch_os_places_addresses. Error placeholders
+    (e.g. an invalid key) are specific to the caller and are never cached.
+    """
+    key = postcode_cache_key("os", postcode)
+    addresses = await cache_get(OS_ADDRESS_CACHE, key)
+    if addresses is not None:
+        return addresses
+
+    async def fetch():
+        results = index_addresses(await fetch_os_places_addresses(postcode, api_key))
+        if results["list"] and results["list"][0].get("uprn") != "error":
+            await cache_set(OS_ADDRESS_CACHE, key, results, OS_ADDRESS_CACHE_DURATION)
+        return results
+
+    # Coalesce per key as well as postcode so an invalid key's error never
+    # leaks to callers using a different key.
+    return await single_flight(f"{key}|{api_key}", fetch)
+
+async def lookup_uprn_public(postcode, house_identifier):
     """
     Attempts to find a single UPRN by filtering the list from fetch_public_addresses
     against a house identifier (number or name).
     """
     # Note: This function uses the public scraper implicitly for auto-matching 
     # when no list selection has occurred yet.
-    addresses = fetch_public_addresses(postcode)
-    target = house_identifier.lower()
-    
-    for item in addresses:
-        addr_text = item["address"].lower()
-        # Check if house identifier matches start of string or is contained clearly
-        if target in addr_text:
-            logger.info(f"UPRN AUTO-MATCH: '{house_identifier}' matched '{item['address']}' -> {item['uprn']}")
-            return item["uprn"]
+    addresses = await get_public_addresses(postcode)
+    item = match_address(addresses, house_identifier)
+    if item:
+        logger.info("UPRN AUTO-MATCH: '%s' matched '%s' -> %s", house_identifier, item['address'], item['uprn'])
+        return item["uprn"]
             
     return None
 
-def lookup_uprn_os(postcode, house_identifier, api_key):
+async def lookup_uprn_os(postcode, house_identifier, api_key):
     """
     Attempts to find a single UPRN using the OS Places API.
     """
-    addresses = fetch_os_places_addresses(postcode, api_key)
-    target = house_identifier.lower()
+    addresses = await get_os_places_addresses(postcode, api_key)
     
     # Check for error response first
-    if addresses and "error" in addresses[0].get("uprn", ""):
+    if addresses["list"] and "error" in addresses["list"][0].get("uprn", ""):
         return None
 
-    for item in addresses:
-        addr_text = item["address"].lower()
-        if target in addr_text:
-            logger.info(f"OS UPRN MATCH: '{house_identifier}' matched '{item['address']}' -> {item['uprn']}")
-            return item["uprn"]
+    item = match_address(addresses, house_identifier)
+    if item:
+        logger.info("OS UPRN MATCH: '%s' matched '%s' -> %s", house_identifier, item['address'], item['uprn'])
+        return item["uprn"]
             
     return None
 
 # --- STANDARD API HANDLER ---
-def get_standard_api_bins(base_url, uprn):
+async def get_standard_api_bins(base_url, uprn):
     """
     Queries an API that conforms to the UK Waste Service Standards.
     See: https://communitiesuk.github.io/waste-service-standards/apis/waste_services.html
@@ -193,10 +635,10 @@ def get_standard_api_bins(base_url, uprn):
     services_url = f"{base_url}/services"
     params = {"uprn": uprn}
     
-    logger.info(f"STANDARD API: Fetching services from {services_url} for UPRN {uprn}")
+    logger.info("STANDARD API: Fetching services from %s for UPRN %s", services_url, uprn)
     
     try:
-        resp = requests.get(services_url, params=params, timeout=15)
+        resp = await asyncio.to_thread(SESSION.get, services_url, params=params, timeout=15)
         if resp.status_code == 404:
              raise Exception(f"Endpoint not found: {services_url}")
         resp.raise_for_status()
@@ -206,97 +648,486 @@ def get_standard_api_bins(base_url, uprn):
         except:
              raise Exception("API returned non-JSON response")
 
-        # 2. Iterate through services
+        # 2. Fetch details for services without inline collections, all at once
+        def detail_url_for(service):
+            service_id_url = service.get("@id") or service.get("id")
+
+            # Construct detail URL
+            if str(service_id_url).startswith("http"):
+                return service_id_url
+            if "/" in str(service_id_url):
+                 detail_url = str(service_id_url)
+                 if detail_url.startswith("/"):
+                     return f"{base_url}{detail_url}"
+                 return f"{base_url}/{detail_url}"
+            return f"{base_url}/services/{service_id_url}"
+
+        async def fetch_detail(service):
+            detail_url = detail_url_for(service)
+            logger.info("STANDARD API: Fetching details from %s", detail_url)
+            try:
+                detail_resp = await asyncio.to_thread(SESSION.get, detail_url, params={"uprn": uprn}, timeout=10)
+                if detail_resp.status_code == 200:
+                    return detail_resp.json()
+            except Exception as e:
+                logger.warning("Failed to fetch details for service %s: %s", service.get('name'), e)
+            return service
+
+        needs_detail = [i for i, service in enumerate(services_data) if not service.get("next_collections")]
+        details = await asyncio.gather(*(fetch_detail(services_data[i]) for i in needs_detail))
+        for i, service in zip(needs_detail, details):
+            services_data[i] = service
+
         for service in services_data:
             next_colls = service.get("next_collections", [])
             
-            if not next_colls:
-                service_id_url = service.get("@id") or service.get("id")
-                
-                # Construct detail URL
-                if str(service_id_url).startswith("http"):
-                    detail_url = service_id_url
-                else:
-                    if "/" in str(service_id_url):
-                         detail_url = str(service_id_url)
-                         if not detail_url.startswith("http"):
-                             if detail_url.startswith("/"):
-                                 detail_url = f"{base_url}{detail_url}"
-                             else:
-                                 detail_url = f"{base_url}/{detail_url}"
-                    else:
-                        detail_url = f"{base_url}/services/{service_id_url}"
-                
-                logger.info(f"STANDARD API: Fetching details from {detail_url}")
-                try:
-                    detail_resp = requests.get(detail_url, params={"uprn": uprn}, timeout=10)
-                    if detail_resp.status_code == 200:
-                        service = detail_resp.json()
-                        next_colls = service.get("next_collections", [])
-                except Exception as e:
-                    logger.warning(f"Failed to fetch details for service {service.get('name')}: {e}")
-            
             # 3. Process Collections
             bin_type = service.get("name", "Unknown Bin")
             
             for coll in next_colls:
                 date_str = coll.get("start_date")
                 if date_str:
-                    try:
-                        if "T" in date_str:
-                            date_only = date_str.split("T")[0]
-                            y, m, d = date_only.split("-")
-                            formatted_date = f"{d}/{m}/{y}"
-                        else:
-                            formatted_date = date_str
-                            
-                        bins.append({
-                            "bin": bin_type,
-                            "date": formatted_date
-                        })
-                    except Exception as e:
-                        logger.warning(f"STANDARD API: Date parse error for {date_str}: {e}")
+                    # ISO 8601 (YYYY-MM-DD[THH:MM:SS...]): slice the fields directly
+                    if len(date_str) >= 10 and date_str[4] == date_str[7] == "-" and date_str[:4].isdigit():
+                        formatted_date = f"{date_str[8:10]}/{date_str[5:7]}/{date_str[:4]}"
+                    elif "T" in date_str:
+                        # Looks like a timestamp but isn't ISO (e.g. "TBC")
+                        logger.warning("STANDARD API: Date parse error for %s", date_str)
+                        continue
+                    else:
+                        formatted_date = date_str
+
+                    bins.append({
+                        "bin": bin_type,
+                        "date": formatted_date
+                    })
 
         return {"bins": bins}
 
     except Exception as e:
-        logger.error(f"STANDARD API ERROR: {e}")
+        logger.error("STANDARD API ERROR: %s", e)
         raise HTTPException(status_code=500, detail=f"Standard API connection failed: {str(e)}")
 
 
-@app.get("/")
-def home():
-    return {"status": "OK", "message": "Bin API is running (v3.8 - OS API Integration)."}
+# --- SCRAPER EXECUTION ---
+ADDRESS_NOT_FOUND = "Address not found by council system. Please try searching with your UPRN (12-digit number) found on 'uprn.uk'."
+
+# Scrapers run in a pool of long-lived processes: each one imports
+# collect_data (and its selenium/pandas/bs4 dependencies) once, and a scraper
+# that hangs or crashes cannot take the API process down with it. Each worker
+# holds ~115MB once imported, so the default stays small enough for a 512MB
+# instance; raise SCRAPER_WORKERS where there is memory to spare.
+SCRAPER_WORKERS = int(os.environ.get("SCRAPER_WORKERS", 2))
+SCRAPER_POOL = None
 
-@app.get("/get_councils")
-def get_councils():
-    councils = []
-    errors = []
+# Wall-clock limit for one scrape, in the pool or as a collect_data.py
+# subprocess, before it is killed
+SCRAPER_TIMEOUT = int(os.environ.get("SCRAPER_TIMEOUT", 180))
+
+# Workers come from a fork server rather than being forked from this process:
+# by the time the pool starts them the server is running threads (the log
+# listener, to_thread workers) and holds its listening and client sockets,
+# none of which a child should inherit. The fork server imports collect_data
+# once, so each worker it forks starts with it loaded.
+SCRAPER_MP_CONTEXT = multiprocessing.get_context("forkserver")
+SCRAPER_MP_CONTEXT.set_forkserver_preload(["uk_bin_collection.uk_bin_collection.collect_data"])
+
+def start_scraper_pool():
+    """
+    (Re)creates the scraper process pool when collect_data is importable.
+    """
+    global SCRAPER_POOL
+    if UKBinCollectionApp is not None:
+        SCRAPER_POOL = ProcessPoolExecutor(
+            max_workers=SCRAPER_WORKERS, mp_context=SCRAPER_MP_CONTEXT, initializer=preload_scraper
+        )
+        logger.info("Started scraper pool with %s workers", SCRAPER_WORKERS)
+
+def recycle_scraper_pool(pool):
+    """
+    Replaces a broken or stuck pool, once however many requests notice it.
+    Its workers are killed first: shutdown() alone leaves a hung scraper
+    (and its browser) running. Other scrapes still on the pool fail with
+    BrokenProcessPool.
+    """
+    if SCRAPER_POOL is not pool:
+        return
+    for process in list((pool._processes or {}).values()):
+        process.kill()
+    pool.shutdown(wait=False, cancel_futures=True)
+    start_scraper_pool()
+
+async def run_scraper(args):
+    """
+    Runs run_collect_data on the scraper pool, starting the pool first if the
+    app was run without its lifespan. Never on a thread: run_collect_data
+    swaps the process-wide sys.stdout while it runs.
+    """
+    if SCRAPER_POOL is None:
+        start_scraper_pool()
+    pool = SCRAPER_POOL
     try:
-        found_councils_path = None
-        for root, dirs, files in os.walk(os.getcwd()):
-            if "councils" in dirs:
-                found_councils_path = os.path.join(root, "councils")
-                py_files = [f for f in os.listdir(found_councils_path) if f.endswith(".py")]
-                if len(py_files) > 0:
-                    break
-        
-        if found_councils_path:
-            for file in os.listdir(found_councils_path):
-                if file.endswith(".py") and not file.startswith("__"):
-                    raw_name = file[:-3]
-                    formatted_name = re.sub(r'(?<!^)(?=[A-Z])', ' ', raw_name)
-                    councils.append(formatted_name)
-            councils.sort()
-            return {"councils": councils}
+        return await asyncio.wait_for(
+            asyncio.get_running_loop().run_in_executor(pool, run_collect_data, args), SCRAPER_TIMEOUT
+        )
+    except asyncio.TimeoutError:
+        logger.error("Scraper timed out after %ss, restarting the pool", SCRAPER_TIMEOUT)
+        recycle_scraper_pool(pool)
+        raise RuntimeError(f"Scraper timed out after {SCRAPER_TIMEOUT}s")
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory); replace the pool for later
+        # requests
+        logger.error("Scraper pool broken, restarting it")
+        recycle_scraper_pool(pool)
+        raise RuntimeError("Scraper worker process died")
+
+# Per-stream cap on subprocess output kept in memory. Only the tail is kept:
+# collect_data prints its JSON last, after any log noise.
+MAX_SCRAPER_OUTPUT = 4 * 1024 * 1024
+
+# Environment for the collect_data.py subprocess, built once. Unbuffered, so
+# output reaches read_tail as it is written rather than in one block-buffered
+# burst when the child exits.
+SCRAPER_ENV = {
+    **os.environ,
+    "PYTHONPATH": os.getcwd() + os.pathsep + os.environ.get("PYTHONPATH", ""),
+    "PYTHONUNBUFFERED": "1",
+}
+
+async def read_tail(stream, limit=MAX_SCRAPER_OUTPUT):
+    """
+    Drains an asyncio stream, keeping at most the last `limit` bytes.
+    """
+    buf = bytearray()
+    while True:
+        chunk = await stream.read(65536)
+        if not chunk:
+            break
+        buf += chunk
+        if len(buf) > limit:
+            del buf[:len(buf) - limit]
+    return bytes(buf)
+
+# Caps concurrent collect_data.py subprocesses (each may start a browser) to
+# bound RAM, as the pool's worker count does for in-process scraping. Created
+# on first use so it binds to the running event loop.
+SCRAPER_SLOTS = None
+
+async def run_collect_data_subprocess(args):
+    """
+    Fallback for when collect_data cannot be imported: runs collect_data.py
+    in a fresh interpreter. Returns (returncode, stdout, stderr) with stdout
+    left as bytes for orjson and stderr decoded for error messages.
+    """
+    global SCRAPER_SLOTS
+    if SCRAPER_SLOTS is None:
+        SCRAPER_SLOTS = asyncio.Semaphore(SCRAPER_WORKERS)
+    async with SCRAPER_SLOTS:
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable, "-u", str(collect_data_path), *args,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE, env=SCRAPER_ENV,
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                asyncio.gather(read_tail(proc.stdout), read_tail(proc.stderr)), SCRAPER_TIMEOUT
+            )
+            returncode = await proc.wait()
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise RuntimeError(f"Scraper timed out after {SCRAPER_TIMEOUT}s")
+        except asyncio.CancelledError:
+            # Client gone: don't leave the scraper (and any browser) running
+            proc.kill()
+            await proc.wait()
+            raise
+        return returncode, stdout, stderr.decode("utf-8", errors="replace")
+
+def last_json_object(buf):
+    """
+    Returns the last brace-balanced {...} block of scraper output (the JSON
+    collect_data prints after any log noise), or None. Scans back from the
+    final '}' in linear time; a greedy regex over the output can backtrack.
+    Braces inside JSON strings (e.g. a bin named "Garden {brown}") are
+    skipped: a quote opens or closes a string unless an odd number of
+    backslashes escapes it.
+    """
+    end = buf.rfind(b'}')
+    if end < 0:
+        return None
+    depth = 0
+    in_string = False
+    for i in range(end, -1, -1):
+        c = buf[i]
+        if c == 0x22:  # "
+            slashes = 0
+            while i - slashes > 0 and buf[i - slashes - 1] == 0x5C:  # backslash
+                slashes += 1
+            if not slashes % 2:
+                in_string = not in_string
+        elif in_string:
+            continue
+        elif c == 0x7D:  # }
+            depth += 1
+        elif c == 0x7B:  # {
+            depth -= 1
+            if depth == 0:
+                return buf[i:end + 1]
+    return None
+
+def parse_scraper_output(output):
+    """
+    Parses the stdout bytes of a collect_data.py subprocess, salvaging the
+    JSON from around any log noise.
+    """
+    if any(marker in output for marker in SCRAPER_INPUT_ERRORS):
+         raise HTTPException(status_code=400, detail=ADDRESS_NOT_FOUND)
+
+    # Output that doesn't even start like JSON is log noise around it; skip
+    # a whole-buffer parse that is bound to fail
+    if output[:1] in (b'{', b'['):
+        try:
+            return orjson.loads(output)
+        except orjson.JSONDecodeError:
+            pass
+
+    # collect_data pretty-prints its JSON last, after any log lines, and only
+    # the top-level object starts at column 0 - try from there first
+    start = output.rfind(b'\n{')
+    if start >= 0:
+        try:
+            return orjson.loads(output[start + 1:])
+        except orjson.JSONDecodeError:
+            pass
+
+    json_blob = last_json_object(output) if b'"bins"' in output else None
+    if json_blob:
+        return orjson.loads(json_blob)
+    raise Exception(f"Could not parse JSON. Output start: {output[:100].decode('utf-8', errors='replace')}...")
+
+def describe_scraper_error(err_msg):
+    """
+    Turns raw scraper error output into a message suitable for the UI.
+    """
+    if "MissingSchema" in err_msg:
+        return "Scraper failed on placeholder URL. This council might require a specific URL."
+    if "not found" in err_msg.lower():
+        return "Address not found."
+    return err_msg
+
+
+def parse_bin_input(input_data):
+    """
+    Splits free-text /get_bins input into (url, uprn, postcode, house
+    identifier). The postcode is upper-cased; the house identifier is what is
+    left once the URL and postcode are cut out, and is only kept alongside a
+    postcode.
+    """
+    detected_url = None
+    extracted_uprn = None
+    extracted_postcode = ""
+    cut_spans = []
+    scan_from = 0
+
+    # 1. A leading URL is the whole first word, even without a scheme
+    # separator the regex would recognise
+    if input_data[:4].lower() == "http":
+        detected_url = input_data.split(" ")[0]
+        cut_spans.append((0, len(detected_url)))
+        scan_from = len(detected_url)
+
+    # 2. One scan picks up the first URL, postcode and UPRN in the rest
+    for token in INPUT_TOKEN_RE.finditer(input_data, scan_from):
+        kind = token.lastgroup
+        if kind == "url":
+            if detected_url is None:
+                detected_url = token.group()
+                cut_spans.append(token.span())
+        elif kind == "postcode":
+            if not extracted_postcode:
+                extracted_postcode = token.group().upper()
+                cut_spans.append(token.span())
+        elif extracted_uprn is None:
+            extracted_uprn = token.group()
+
+    # 3. What is left (minus URL and postcode) names the house
+    remaining_text = input_data
+    for start, end in sorted(cut_spans, reverse=True):
+        remaining_text = remaining_text[:start] + remaining_text[end:]
+    remaining_text = remaining_text.strip()
+
+    house_identifier = remaining_text.strip(",. ") if extracted_postcode else ""
+    return detected_url, extracted_uprn, extracted_postcode, house_identifier
+
+
+# --- MODULE HANDLERS ---
+@dataclass
+class BinContext:
+    """
+    Parsed /get_bins input, handed to the module handler.
+    """
+    module_name: str
+    input_data: str
+    detected_url: Optional[str]
+    extracted_uprn: Optional[str]
+    extracted_postcode: str
+    house_identifier: str
+    os_key: Optional[str]
+    skip_url_fetch: bool = False
+    # Decisions taken along the way, logged as one record per request
+    log: dict = field(default_factory=dict)
+
+async def handle_standard(ctx):
+    """
+    Modules speaking the UK Waste Service Standards API are queried natively.
+    """
+    if not ctx.detected_url or not ctx.extracted_uprn:
+         raise HTTPException(status_code=400, detail="Standard API requires both a URL and a UPRN in the input.")
+
+    ctx.log["mode"] = "standard api"
+    return await get_standard_api_bins(ctx.detected_url, ctx.extracted_uprn)
+
+async def handle_wiltshire(ctx):
+    """
+    Wiltshire needs the -s flag, its Azure URL and always a real postcode.
+    """
+    ctx.skip_url_fetch = True
+    if not ctx.detected_url:
+        ctx.detected_url = "https://ilambassadorformsprod.azurewebsites.net/wastecollectiondays/index"
+        ctx.log["default_url"] = True
+    if ctx.extracted_uprn and not ctx.extracted_postcode:
+         raise HTTPException(status_code=400, detail="Wiltshire Council requires both UPRN and Postcode.")
+    return await handle_generic(ctx)
+
+async def handle_generic(ctx):
+    """
+    Builds collect_data.py arguments from the parsed input, runs the council
+    scraper and returns its parsed JSON output.
+    """
+    # --- PREPARE SCRAPER ARGUMENTS (collect_data.py CLI) ---
+    args = [ctx.module_name]
+    used_dummy_postcode = False
+
+    if ctx.detected_url:
+        ctx.log["url"] = ctx.detected_url
+        args.append(ctx.detected_url)
+    else:
+        args.append("https://example.com") 
+
+    # Apply Skip Flag if needed
+    if ctx.skip_url_fetch:
+        args.append("-s")
+
+    if ctx.extracted_uprn:
+        # Case A: User provided UPRN (explicitly or via dropdown selection)
+        ctx.log["mode"] = "uprn"
+        args.append("-u")
+        args.append(ctx.extracted_uprn)
+
+        args.append("-p")
+        if ctx.extracted_postcode:
+            args.append(ctx.extracted_postcode)
         else:
-            errors.append("Could not locate 'councils' folder.")
-    except Exception as e:
-        errors.append(f"Error listing councils: {str(e)}")
-    return {"error": "Could not list councils.", "details": errors}
+            args.append("BA14 8JN") # Dummy postcode
+            used_dummy_postcode = True
+
+    else:
+        # Case B: Postcode Search (Address Name/Number provided)
+        ctx.log["mode"] = "postcode"
+
+        if ctx.extracted_postcode:
+            house_identifier = ctx.house_identifier
+
+            # --- AUTO-LOOKUP ATTEMPT ---
+            found_uprn = None
+            if house_identifier:
+                # Priority: Use OS API if key is available
+                if ctx.os_key and len(ctx.os_key) > 5:
+                    ctx.log["lookup"] = "os places"
+                    found_uprn = await lookup_uprn_os(ctx.extracted_postcode, house_identifier, ctx.os_key)
+                else:
+                    ctx.log["lookup"] = "public"
+                    found_uprn = await lookup_uprn_public(ctx.extracted_postcode, house_identifier)
+
+            if found_uprn:
+                 ctx.log["mode"] = "uprn (auto-lookup)"
+                 args.append("-u")
+                 args.append(found_uprn)
+                 args.append("-p")
+                 args.append(ctx.extracted_postcode)
+            else:
+                # Fallback to standard scraper logic if auto-lookup fails
+                args.append("-p")
+                args.append(ctx.extracted_postcode)
+                if house_identifier:
+                    args.append("-n")
+                    args.append(house_identifier)
+        else:
+            ctx.log["mode"] = "raw input as postcode"
+            args.append("-p")
+            args.append(ctx.input_data)
+
+    ctx.log["args"] = args
+
+    if UKBinCollectionApp is not None:
+        # Pre-warmed pool: no interpreter start-up or package re-import per request
+        try:
+            json_data = await run_scraper(args)
+        except ScraperInputError as e:
+            logger.error("SCRAPER INPUT ERROR: %s", e)
+            raise HTTPException(status_code=400, detail=ADDRESS_NOT_FOUND)
+        except Exception as e:
+            logger.error("SCRAPER ERROR: %s: %s", type(e).__name__, e)
+            raise Exception(f"Script failed: {describe_scraper_error(f'{type(e).__name__}: {e}')}")
+    else:
+        # Fallback: run collect_data.py in a fresh interpreter
+        returncode, stdout, stderr = await run_collect_data_subprocess(args)
 
-@app.post("/get_addresses")
-def get_addresses(req: AddressRequest):
+        if stdout and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("STDOUT: %.200s...", stdout[:200].decode('utf-8', errors='replace'))
+        if stderr:
+            logger.error("STDERR: %s", stderr)
+
+        if returncode != 0:
+            raise Exception(f"Script failed: {describe_scraper_error(stderr)}")
+
+        json_data = parse_scraper_output(stdout.strip())
+
+    if isinstance(json_data, dict) and json_data.get("bins") == []:
+         if used_dummy_postcode:
+             raise HTTPException(status_code=400, detail="This Council requires you to provide the Postcode alongside the UPRN.")
+         logger.warning("Scraper returned empty bins list.")
+
+    return json_data
+
+# Modules needing more than the generic scraper run. Anything else falls
+# through to handle_generic.
+HANDLERS = {
+    "standard_waste_api": handle_standard,
+    "wiltshirecouncil": handle_wiltshire,
+}
+
+
+@app.get("/", response_model=None)
+async def home():
+    return {"status": "OK", "message": "Bin API is running (v3.8 - OS API Integration)."}
+
+@app.get("/get_councils", response_model=None)
+async def get_councils():
+    if councils_path is None:
+        return {"error": "Could not list councils.", "details": ["Could not locate 'councils' folder."]}
+    list_councils()  # refreshes the cached body if the folder changed
+    return Response(COUNCILS_CACHE["body"], media_type="application/json")
+
+@functools.lru_cache(maxsize=4096)
+def no_addresses_body(postcode):
+    """
+    Encoded /get_addresses reply for a postcode with no results.
+    """
+    return orjson.dumps([{"uprn": "error", "address": f"No addresses found for {postcode}. Please check format."}])
+
+@app.post("/get_addresses", response_model=None)
+async def get_addresses(req: AddressRequest):
     """
     Returns a list of addresses and their UPRNs for a given postcode.
     Used to populate dropdowns in UI.
@@ -307,212 +1138,106 @@ def get_addresses(req: AddressRequest):
     
     if os_key and len(os_key) > 5:
         # User provided an OS API Key - Use official source
-        addresses = fetch_os_places_addresses(postcode, os_key)
+        addresses = await get_os_places_addresses(postcode, os_key)
     else:
         # No Key - Use Public Scraper
-        addresses = fetch_public_addresses(postcode)
+        addresses = await get_public_addresses(postcode)
     
-    if addresses:
+    if addresses["list"]:
         # Sort officially or alphabetically for better UI
         # OS API often returns mixed case, let's normalize if needed, but keeping raw is usually safer
-        return addresses
+        return Response(addresses["body"], media_type="application/json")
     else:
-        return [{"uprn": "error", "address": f"No addresses found for {postcode}. Please check format."}]
+        return Response(no_addresses_body(postcode), media_type="application/json")
 
-@app.post("/get_bins")
-def get_bins(req: BinRequest):
-    if not collect_data_path:
+@app.post("/get_bins", response_model=None)
+async def get_bins(req: BinRequest):
+    # Scraper output is arbitrary JSON; returning the response directly skips
+    # FastAPI's jsonable_encoder walk over every bin entry.
+    if UKBinCollectionApp is None and not collect_data_path:
         raise HTTPException(status_code=500, detail="Server misconfigured: collect_data.py not found.")
 
     try:
         module_name = req.module.replace(" ", "")
+        module_l = module_name.lower()
+        if module_l not in HANDLERS and councils_path:
+            # Reject unknown councils up front rather than after a failed
+            # scraper run
+            module_name = resolve_module(module_name)
+            if module_name is None:
+                raise HTTPException(status_code=400, detail=f"Unknown council: {req.module}")
         input_data = req.address_data.strip()
+        input_l = input_data.lower()
         os_key = req.os_api_key
+
+        if not input_data:
+            raise HTTPException(status_code=400, detail="Please provide a postcode, address or UPRN.")
         
         # --- CACHE CHECK ---
-        cache_key = f"{module_name}|{input_data.lower()}"
-        current_time = time.time()
+        cache_key = make_cache_key(module_name, input_l)
+        cached_data = await cache_get(BIN_CACHE, cache_key)
+        if cached_data is not None:
+            logger.info("CACHE HIT: Returning saved data for %s", input_data)
+            return ORJSONResponse(cached_data)
         
-        if cache_key in BIN_CACHE:
-            cached_item = BIN_CACHE[cache_key]
-            if current_time - cached_item["timestamp"] < CACHE_DURATION:
-                logger.info(f"CACHE HIT: Returning saved data for {input_data}")
-                return cached_item["data"]
-            else:
-                del BIN_CACHE[cache_key]
-        
-        # --- PREPARE SUBPROCESS ---
-        env = os.environ.copy()
-        env["PYTHONPATH"] = os.getcwd() + os.pathsep + env.get("PYTHONPATH", "")
-        cmd = [sys.executable, collect_data_path, module_name]
-        
-        used_dummy_postcode = False 
-
         # --- INTELLIGENT PARSING LOGIC ---
-        detected_url = None
-        extracted_uprn = None
-        extracted_postcode = ""
-        remaining_text = input_data
-        
-        # 1. Extract URL if present
-        url_match = re.search(r'https?://[^\s]+', input_data)
-        if url_match:
-             detected_url = url_match.group(0)
-             remaining_text = input_data.replace(detected_url, "").strip()
-        elif input_data.lower().startswith("http"):
-             detected_url = input_data.split(" ")[0]
-             remaining_text = input_data.replace(detected_url, "").strip()
-
-        # 2. Extract Postcode
-        pc_pattern = r'([Gg][Ii][Rr] 0[Aa]{2})|((([A-Za-z][0-9]{1,2})|(([A-Za-z][A-Ha-hJ-Yj-y][0-9]{1,2})|(([A-Za-z][0-9][A-Za-z])|([A-Za-z][A-Ha-hJ-Yj-y][0-9][A-Za-z]?))))\s?[0-9][A-Za-z]{2})'
-        pc_match = re.search(pc_pattern, remaining_text)
-        if pc_match:
-            extracted_postcode = pc_match.group(0).upper()
-            remaining_text = remaining_text.replace(extracted_postcode, "").strip()
-
-        # 3. Detect UPRN (Standalone 8-12 digits)
-        uprn_match = re.search(r'\b\d{8,12}\b', remaining_text)
-        if uprn_match:
-            extracted_uprn = uprn_match.group(0)
+        detected_url, extracted_uprn, extracted_postcode, house_identifier = parse_bin_input(input_data)
 
-        # --- BRANCH: STANDARD API ---
-        if module_name.lower() == "standard_waste_api":
-            if not detected_url or not extracted_uprn:
-                 raise HTTPException(status_code=400, detail="Standard API requires both a URL and a UPRN in the input.")
-            
-            logger.info("Executing Native Standard API Handler")
-            json_data = get_standard_api_bins(detected_url, extracted_uprn)
-            
-            BIN_CACHE[cache_key] = {"timestamp": time.time(), "data": json_data}
-            return json_data
+        ctx = BinContext(
+            module_name=module_name,
+            input_data=input_data,
+            detected_url=detected_url,
+            extracted_uprn=extracted_uprn,
+            extracted_postcode=extracted_postcode,
+            house_identifier=house_identifier,
+            os_key=os_key,
+        )
+        handler = HANDLERS.get(module_l, handle_generic)
 
-        # --- CONFIGURATION OVERRIDES ---
-        skip_url_fetch = False
-        
-        # Special Handling for Wiltshire Council
-        if module_name.lower() == "wiltshirecouncil":
-            # Wiltshire often needs -s flag and specific Azure URL
-            skip_url_fetch = True
-            if not detected_url:
-                detected_url = "https://ilambassadorformsprod.azurewebsites.net/wastecollectiondays/index"
-                logger.info("Wiltshire: Using default Azure URL")
-
-        # --- BRANCH: SUBPROCESS (SCRAPER) ---
-        if detected_url:
-            logger.info(f"DETECTED MODE: URL")
-            cmd.append(detected_url)
-        else:
-            cmd.append("https://example.com") 
-        
-        # Apply Skip Flag if needed
-        if skip_url_fetch:
-            cmd.append("-s")
-
-        if extracted_uprn:
-            # Case A: User provided UPRN (explicitly or via dropdown selection)
-            logger.info(f"DETECTED MODE: UPRN (Explicit: {extracted_uprn})")
-            cmd.append("-u")
-            cmd.append(extracted_uprn)
-            
-            if extracted_postcode:
-                cmd.append("-p")
-                cmd.append(extracted_postcode)
-            else:
-                # If Wiltshire, we MUST have postcode.
-                if module_name.lower() == "wiltshirecouncil":
-                     raise HTTPException(status_code=400, detail="Wiltshire Council requires both UPRN and Postcode.")
-                cmd.append("-p")
-                cmd.append("BA14 8JN") # Dummy postcode
-                used_dummy_postcode = True
-        
-        else:
-            # Case B: Postcode Search (Address Name/Number provided)
-            logger.info(f"DETECTED MODE: POSTCODE SEARCH")
-            
-            if extracted_postcode:
-                house_identifier = remaining_text.strip(",. ")
-                
-                # --- AUTO-LOOKUP ATTEMPT ---
-                found_uprn = None
-                if house_identifier:
-                    # Priority: Use OS API if key is available
-                    if os_key and len(os_key) > 5:
-                        logger.info("Using OS Places API for internal lookup")
-                        found_uprn = lookup_uprn_os(extracted_postcode, house_identifier, os_key)
-                    else:
-                        logger.info("Using Public Scraper for internal lookup")
-                        found_uprn = lookup_uprn_public(extracted_postcode, house_identifier)
-                
-                if found_uprn:
-                     logger.info(f"SWITCHING TO UPRN MODE via Auto-Lookup: {found_uprn}")
-                     cmd.append("-u")
-                     cmd.append(found_uprn)
-                     cmd.append("-p")
-                     cmd.append(extracted_postcode)
-                else:
-                    # Fallback to standard scraper logic if auto-lookup fails
-                    cmd.append("-p")
-                    cmd.append(extracted_postcode)
-                    if house_identifier:
-                        logger.info(f"Adding House Identifier (Name/Number): {house_identifier}")
-                        cmd.append("-n")
-                        cmd.append(house_identifier)
-            else:
-                logger.info(f"No regex match. Sending raw input as postcode: {input_data}")
-                cmd.append("-p")
-                cmd.append(input_data)
-
-        logger.info(f"Command: {cmd}")
-
-        result = subprocess.run(cmd, capture_output=True, text=True, env=env)
-        
-        if result.stdout:
-            logger.info(f"STDOUT: {result.stdout[:200]}...")
-        if result.stderr:
-            logger.error(f"STDERR: {result.stderr}")
-
-        if result.returncode != 0:
-            err_msg = result.stderr
-            if "MissingSchema" in err_msg:
-                 err_msg = "Scraper failed on placeholder URL. This council might require a specific URL."
-            elif "not found" in err_msg.lower():
-                 err_msg = "Address not found."
-            raise Exception(f"Script failed: {err_msg}")
-
-        output = result.stdout.strip()
-        
-        if "Exception encountered" in output or "Invalid UPRN" in output:
-             raise HTTPException(status_code=400, detail="Address not found by council system. Please try searching with your UPRN (12-digit number) found on 'uprn.uk'.")
+        async def fetch():
+            try:
+                json_data = await handler(ctx)
 
-        if '"bins": []' in output:
-             if used_dummy_postcode:
-                 raise HTTPException(status_code=400, detail="This Council requires you to provide the Postcode alongside the UPRN.")
-             logger.warning("Scraper returned empty bins list.")
-        
-        try:
-            json_data = json.loads(output)
-        except json.JSONDecodeError:
-            json_match = re.search(r'(\{.*"bins".*\})', output, re.DOTALL)
-            if json_match:
-                json_data = json.loads(json_match.group(1))
-            else:
-                raise Exception(f"Could not parse JSON. Output start: {output[:100]}...")
-
-        # --- SAVE TO CACHE ---
-        BIN_CACHE[cache_key] = {
-            "timestamp": time.time(),
-            "data": json_data
-        }
-        logger.info(f"Saved result to CACHE for key: {cache_key}")
+                # --- SAVE TO CACHE ---
+                # An empty result is more likely a lookup miss than a property
+                # with no collections; don't pin it for CACHE_DURATION
+                if not (isinstance(json_data, dict) and json_data.get("bins") == []):
+                    await cache_set(BIN_CACHE, cache_key, json_data, CACHE_DURATION)
+                    ctx.log["cached"] = cache_key
+                return json_data
+            finally:
+                # One record per scrape rather than one per decision; errors
+                # are still logged on their own where they happen
+                logger.info("get_bins %s: %s", ctx.module_name, ctx.log)
 
-        return json_data
+        # Identical requests arriving while a scrape is running wait for it
+        # rather than starting their own browser/scraper run
+        return ORJSONResponse(await single_flight(cache_key, fetch))
 
     except HTTPException as he:
         raise he
     except Exception as e:
-        logger.error(f"Execution Error: {e}")
+        logger.error("Execution Error: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 10000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    # A single worker by default: each one starts its own scraper pool, and
+    # os.cpu_count() reports the host's CPUs rather than the container's
+    # share. Set WORKERS to scale out; each worker imports this module itself,
+    # so set REDIS_URL too so that workers share cached bin and address
+    # results (request coalescing stays per worker).
+    workers = int(os.environ.get("WORKERS", 1))
+    # uvicorn needs an import string to start several workers; with one, hand
+    # it this app so the module is not imported a second time as sbd_server.
+    # Keep idle client connections open for longer than uvicorn's 5s default so
+    # front-ends polling the API back-to-back can reuse their TCP/TLS session.
+    uvicorn.run(
+        app if workers == 1 else "sbd_server:app",
+        host="0.0.0.0",
+        port=port,
+        workers=workers,
+        # get_bins/get_addresses log what they do; skip uvicorn's per-request line
+        access_log=False,
+        timeout_keep_alive=65,
+    )
@@ -0,0 +1,61 @@
+"""
+Code run inside sbd_server.py's scraper pool workers.
+
+Kept apart from sbd_server so that workers, which start fresh rather than
+as forks of the server process, only import this and collect_data - not the
+web app, its caches or its logging thread.
+"""
+
+import contextlib
+import io
+import logging
+
+logger = logging.getLogger("sbd_server.scraper")
+
+# Printed by common.check_* helpers on bad input; check_uprn only prints and
+# the scraper carries on, so the output has to be checked for them
+SCRAPER_INPUT_ERRORS = (b"Exception encountered", b"Invalid UPRN")
+
+
+class ScraperInputError(Exception):
+    """
+    The scraper rejected its postcode/UPRN input (see SCRAPER_INPUT_ERRORS).
+    """
+
+
+def preload_scraper():
+    """
+    Pool initializer: imports collect_data in the worker up front so the
+    first request it serves does not pay for the import.
+    """
+    logging.basicConfig(level=logging.INFO, force=True)
+    import uk_bin_collection.uk_bin_collection.collect_data  # noqa: F401
+
+
+def run_collect_data(args):
+    """
+    Runs a council scraper in-process with `collect_data.py <args>` and
+    returns its parsed data dict. Skipping collect_data's JSON output step
+    means no indent/encode here and no decode back in the API process.
+
+    stdout is captured so the input-error messages the subprocess path
+    checks for are caught here too. Pool workers run one scrape at a time,
+    so swapping sys.stdout is safe there.
+    """
+    from uk_bin_collection.uk_bin_collection.collect_data import UKBinCollectionApp
+
+    collect_app = UKBinCollectionApp()
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output):
+            collect_app.set_args(args)
+            data = collect_app.get_bin_data()
+    except SystemExit as e:
+        # argparse and some common.check_* helpers exit rather than raise
+        raise RuntimeError(f"Scraper exited with code {e.code}")
+    printed = output.getvalue().encode("utf-8", errors="replace")
+    if printed:
+        logger.debug("Scraper output: %.200s", printed)
+    if any(marker in printed for marker in SCRAPER_INPUT_ERRORS):
+        raise ScraperInputError(printed[:200].decode("utf-8", errors="replace"))
+    return data
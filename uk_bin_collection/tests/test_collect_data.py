@@ -55,6 +55,37 @@ def test_client_code():
     )
 
 
+# Test UKBinCollectionApp get_bin_data returns the council's parsed dict
+@patch("uk_bin_collection.collect_data.import_council_module")
+def test_get_bin_data(mock_import_council_module):
+    council_class = mock_import_council_module.return_value.CouncilClass
+    council_class.return_value.get_and_parse_data.return_value = {"bins": []}
+
+    app = UKBinCollectionApp()
+    app.set_args(["council_module", "http://example.com", "-u", "123456789012"])
+
+    assert app.get_bin_data() == {"bins": []}
+    mock_import_council_module.assert_called_once_with("council_module")
+    args, kwargs = council_class.return_value.get_and_parse_data.call_args
+    assert args == ("http://example.com",)
+    assert kwargs["uprn"] == "123456789012"
+    assert kwargs["council_module_str"] == "council_module"
+
+
+# Test import_council_module memoizes the module lookup
+@patch("uk_bin_collection.collect_data.importlib.import_module")
+def test_import_council_module_is_cached(mock_import_module):
+    import_council_module.cache_clear()
+    mock_import_module.return_value = MagicMock()
+
+    first = import_council_module("council_module")
+    second = import_council_module("council_module")
+
+    assert first is second
+    mock_import_module.assert_called_once_with("council_module")
+    import_council_module.cache_clear()
+
+
 # Test the run() function with logging setup
 @patch("uk_bin_collection.collect_data.setup_logging")  # Correct patch path
 @patch("uk_bin_collection.collect_data.UKBinCollectionApp.run")  # Correct patch path
@@ -0,0 +1,320 @@
+import pytest
+
+# The API server's dependencies are not part of the package's own
+pytest.importorskip("fastapi")
+pytest.importorskip("orjson")
+
+import asyncio
+import sys
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import orjson
+import sbd_server
+import scraper_worker
+from sbd_server import (
+    index_addresses,
+    last_json_object,
+    match_address,
+    parse_bin_input,
+    parse_scraper_output,
+)
+
+
+# Test last_json_object
+def test_last_json_object_skips_leading_log_noise():
+    buf = b'INFO {not json\n{"bins": [{"type": "Refuse"}]}'
+    assert orjson.loads(last_json_object(buf)) == {"bins": [{"type": "Refuse"}]}
+
+
+def test_last_json_object_ignores_braces_inside_strings():
+    data = {"bins": [{"type": "Garden {brown} }", "collectionDate": "{"}]}
+    buf = b"log line\n" + orjson.dumps(data)
+    assert orjson.loads(last_json_object(buf)) == data
+
+
+def test_last_json_object_handles_escaped_quotes():
+    data = {"bins": [{"type": 'Says "hi" \\ {', "collectionDate": "01/01/2025"}]}
+    buf = b"noise } {\n" + orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    assert orjson.loads(last_json_object(buf)) == data
+
+
+def test_last_json_object_without_object():
+    assert last_json_object(b"no json here") is None
+    assert last_json_object(b"only a } brace") is None
+
+
+def test_parse_scraper_output_with_trailing_noise():
+    data = {"bins": [{"type": "Recycling", "collectionDate": "02/01/2025"}]}
+    output = b"Starting\n" + orjson.dumps(data, option=orjson.OPT_INDENT_2) + b"\nDone {"
+    assert parse_scraper_output(output) == data
+
+
+def test_parse_scraper_output_input_error():
+    with pytest.raises(sbd_server.HTTPException) as exc_info:
+        parse_scraper_output(b"Exception encountered: Invalid UPRN\n")
+    assert exc_info.value.status_code == 400
+
+
+# Test parse_bin_input
+def test_parse_bin_input_url_uprn_and_postcode():
+    url, uprn, postcode, _ = parse_bin_input(
+        "https://council.example/bins?id=1 100121000001 SN1 1AA"
+    )
+    assert url == "https://council.example/bins?id=1"
+    assert uprn == "100121000001"
+    assert postcode == "SN1 1AA"
+
+
+def test_parse_bin_input_lowercase_postcode_and_house():
+    assert parse_bin_input("10 High Street, sn2 2aa") == (
+        None,
+        None,
+        "SN2 2AA",
+        "10 High Street",
+    )
+
+
+def test_parse_bin_input_uprn_only():
+    assert parse_bin_input("100121000001") == (None, "100121000001", "", "")
+
+
+def test_parse_bin_input_special_postcode():
+    assert parse_bin_input("Rose Cottage, GIR 0AA")[2:] == ("GIR 0AA", "Rose Cottage")
+
+
+def test_parse_bin_input_url_later_in_text():
+    url, uprn, postcode, _ = parse_bin_input("see http://a.example/x 12345678 BA14 8JN")
+    assert (url, uprn, postcode) == ("http://a.example/x", "12345678", "BA14 8JN")
+
+
+# Test match_address
+@pytest.fixture
+def addresses():
+    return index_addresses(
+        [
+            {"uprn": "10", "address": "10 High Street"},
+            {"uprn": "11", "address": "Flat 11, Mill House"},
+            {"uprn": "1", "address": "Flat 1, Mill House"},
+            {"uprn": "3", "address": "Rose Cottage, Lane End"},
+        ]
+    )
+
+
+def test_match_address_number_is_whole(addresses):
+    assert match_address(addresses, "1")["uprn"] == "1"
+    assert match_address(addresses, "10")["uprn"] == "10"
+    assert match_address(addresses, "2") is None
+
+
+def test_match_address_name_ignores_case(addresses):
+    assert match_address(addresses, "rose COTTAGE")["uprn"] == "3"
+
+
+# Test run_collect_data
+class FakeCollectApp:
+    def __init__(self, printed=""):
+        self.printed = printed
+
+    def set_args(self, args):
+        self.args = args
+
+    def get_bin_data(self):
+        print(self.printed)
+        return {"bins": []}
+
+
+def test_run_collect_data_returns_data():
+    stdout = sys.stdout
+    with patch(
+        "uk_bin_collection.uk_bin_collection.collect_data.UKBinCollectionApp",
+        lambda: FakeCollectApp("Fetching calendar"),
+    ):
+        assert scraper_worker.run_collect_data(["WiltshireCouncil"]) == {"bins": []}
+    assert sys.stdout is stdout
+
+
+def test_run_collect_data_invalid_uprn():
+    stdout = sys.stdout
+    with patch(
+        "uk_bin_collection.uk_bin_collection.collect_data.UKBinCollectionApp",
+        lambda: FakeCollectApp("Exception encountered: Invalid UPRN"),
+    ):
+        with pytest.raises(scraper_worker.ScraperInputError):
+            scraper_worker.run_collect_data(["WiltshireCouncil"])
+    assert sys.stdout is stdout
+
+
+def test_get_bins_scraper_input_error_is_400():
+    from fastapi.testclient import TestClient
+
+    async def rejected(args):
+        raise scraper_worker.ScraperInputError("Invalid UPRN")
+
+    with patch.object(sbd_server, "run_scraper", rejected), patch.object(
+        sbd_server, "UKBinCollectionApp", object
+    ):
+        response = TestClient(sbd_server.app).post(
+            "/get_bins",
+            json={"module": "Aberdeen City Council", "address_data": "100000000001 AB1 2CD"},
+        )
+    assert response.status_code == 400
+    key = sbd_server.make_cache_key("AberdeenCityCouncil", "100000000001 ab1 2cd")
+    assert key not in sbd_server.BIN_CACHE
+
+
+# Test single_flight
+async def _single_flight_callers(leader_func, follower_func):
+    leader = asyncio.ensure_future(sbd_server.single_flight("key", leader_func))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(sbd_server.single_flight("key", follower_func))
+    await asyncio.sleep(0)
+    return leader, follower
+
+
+def test_single_flight_shares_leader_result():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"bins": []}
+
+    async def main():
+        leader, follower = await _single_flight_callers(fetch, fetch)
+        return await asyncio.gather(leader, follower)
+
+    assert asyncio.run(main()) == [{"bins": []}, {"bins": []}]
+    assert calls == [1]
+    assert "key" not in sbd_server.INFLIGHT
+
+
+def test_single_flight_shares_leader_exception():
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("scraper failed")
+
+    async def main():
+        leader, follower = await _single_flight_callers(fail, fail)
+        return await asyncio.gather(leader, follower, return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, ValueError) for result in results)
+    assert results[0] is results[1]
+
+
+def test_single_flight_follower_takes_over_cancelled_leader():
+    async def hang():
+        await asyncio.sleep(60)
+
+    async def fetch():
+        return {"bins": ["follower"]}
+
+    async def main():
+        leader, follower = await _single_flight_callers(hang, fetch)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(main()) == {"bins": ["follower"]}
+    assert "key" not in sbd_server.INFLIGHT
+
+
+def test_single_flight_cancelled_follower_leaves_leader_running():
+    async def fetch():
+        await asyncio.sleep(0.01)
+        return {"bins": []}
+
+    async def main():
+        leader, follower = await _single_flight_callers(fetch, fetch)
+        follower.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+        return await leader
+
+    assert asyncio.run(main()) == {"bins": []}
+
+
+# Test RateLimiter and limited_get
+def test_rate_limiter_waits_for_refill():
+    limiter = sbd_server.RateLimiter(2, 1)
+    delays = []
+
+    async def fake_sleep(delay):
+        # Let the time "pass" by backdating the last refill
+        delays.append(delay)
+        limiter.updated -= delay
+
+    async def main():
+        with patch("sbd_server.asyncio.sleep", fake_sleep):
+            for _ in range(3):
+                async with limiter:
+                    pass
+
+    asyncio.run(main())
+    # The burst of two is free; the third waits for half a period
+    assert len(delays) == 1
+    assert delays[0] == pytest.approx(0.5, abs=0.01)
+
+
+def test_rate_limiter_refill_is_capped_at_rate():
+    limiter = sbd_server.RateLimiter(2, 1)
+    limiter.tokens = 0
+    limiter.updated -= 60
+
+    async def main():
+        async with limiter:
+            pass
+
+    asyncio.run(main())
+    assert limiter.tokens == pytest.approx(1, abs=0.01)
+
+
+def http_response(status_code, headers=None):
+    return MagicMock(status_code=status_code, headers=headers or {})
+
+
+def limited_get_with(responses):
+    sleep = AsyncMock()
+    with patch.object(sbd_server.SESSION, "get", side_effect=responses) as get, patch(
+        "sbd_server.asyncio.sleep", sleep
+    ):
+        response = asyncio.run(
+            sbd_server.limited_get(sbd_server.RateLimiter(5, 1), "https://example.test")
+        )
+    return response, get, sleep
+
+
+def test_limited_get_retries_429_with_capped_retry_after():
+    ok = http_response(200)
+    response, get, sleep = limited_get_with([http_response(429, {"Retry-After": "120"}), ok])
+    assert response is ok
+    assert get.call_count == 2
+    sleep.assert_awaited_once_with(sbd_server.MAX_RETRY_AFTER)
+
+
+def test_limited_get_non_numeric_retry_after():
+    ok = http_response(200)
+    response, _, sleep = limited_get_with(
+        [http_response(429, {"Retry-After": "Wed, 21 Oct 2026 07:28:00 GMT"}), ok]
+    )
+    assert response is ok
+    sleep.assert_awaited_once_with(2)
+
+
+def test_limited_get_retries_only_once():
+    limited = http_response(429, {"Retry-After": "1"})
+    response, get, sleep = limited_get_with([http_response(429, {"Retry-After": "1"}), limited])
+    assert response is limited
+    assert get.call_count == 2
+    sleep.assert_awaited_once_with(1.0)
+
+
+def test_get_addresses_rejects_overlong_postcode():
+    from fastapi.testclient import TestClient
+
+    response = TestClient(sbd_server.app).post(
+        "/get_addresses",
+        json={"postcode": "SN1 1AA" * 100, "module": "Wiltshire Council"},
+    )
+    assert response.status_code == 422
@@ -0,0 +1,78 @@
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+pytest.importorskip("lxml")
+
+from uk_bin_collection.uk_bin_collection.councils import WiltshireCouncil
+
+
+def calendar_page(month, year):
+    # Two collection days and one empty day; the 5th lists two bin types
+    return f"""<html><body>
+<div class="cal-inner"><span class="day-no" data-cal-date="{year}-{month:02d}-05T00:00:00">5</span>
+<div class="events-list"><div class="rc-event-container"><span>Household waste and Mixed dry recycling</span></div></div></div>
+<div class="cal-inner"><span class="day-no" data-cal-date="{year}-{month:02d}-12T00:00:00">12</span></div>
+<div class="cal-inner other"><span class="day-no" data-cal-date="{year}-{month:02d}-19T00:00:00">19</span>
+<div class="events-list"><div class="rc-event-container"><span>Garden waste</span></div></div></div>
+</body></html>""".encode()
+
+
+def fake_response(content):
+    response = MagicMock(status_code=200)
+    response.content = content
+    return response
+
+
+NOW = datetime.now()
+# Six months ahead, so never the current month
+EMPTY_MONTH = (NOW.month + 5) % 12 + 1
+
+
+@pytest.fixture
+def posts():
+    requested = []
+
+    def post(url, data=None, **kwargs):
+        requested.append((data["Month"], data["Year"]))
+        page = calendar_page(data["Month"], data["Year"])
+        if data["Month"] == NOW.month:
+            # The same days seen twice, as in overlapping month views, must
+            # not produce duplicate entries
+            page *= 2
+        elif data["Month"] == EMPTY_MONTH:
+            page = b"<!-- no calendar -->"
+        return fake_response(page)
+
+    with patch.object(WiltshireCouncil, "check_postcode", return_value=True), patch.object(
+        WiltshireCouncil._SESSION, "post", side_effect=post
+    ):
+        yield requested
+
+
+def test_parse_data_requests_rolling_twelve_months(posts):
+    WiltshireCouncil.CouncilClass().parse_data("", postcode="SN8 3TE", uprn="100121085972")
+
+    expected = [
+        ((NOW.month - 1 + i) % 12 + 1, NOW.year + (NOW.month - 1 + i) // 12)
+        for i in range(12)
+    ]
+    assert sorted(posts, key=lambda m: (m[1], m[0])) == expected
+
+
+def test_parse_data_extracts_deduplicated_collections(posts):
+    bins = WiltshireCouncil.CouncilClass().parse_data(
+        "", postcode="SN8 3TE", uprn="100121085972"
+    )["bins"]
+
+    first = f"05/{NOW.month:02d}/{NOW.year}"
+    assert bins[:3] == [
+        {"type": "Household waste", "collectionDate": first},
+        {"type": "Mixed dry recycling", "collectionDate": first},
+        {"type": "Garden waste", "collectionDate": f"19/{NOW.month:02d}/{NOW.year}"},
+    ]
+    # Three entries per month, none from the comment-only page
+    assert len(bins) == 3 * 11
+    assert len({(b["type"], b["collectionDate"]) for b in bins}) == len(bins)
+    assert not any(int(b["collectionDate"][3:5]) == EMPTY_MONTH for b in bins)
@@ -1,4 +1,5 @@
 import argparse
+import functools
 import importlib
 import os
 import sys
@@ -11,8 +12,9 @@ from uk_bin_collection.uk_bin_collection.get_bin_data import (
 _LOGGER = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=512)
 def import_council_module(module_name, src_path="councils"):
-    """Dynamically import the council processor module."""
+    """Dynamically import the council processor module (memoized per name)."""
     module_path = os.path.realpath(os.path.join(os.path.dirname(__file__), src_path))
     if module_path not in sys.path:
         sys.path.append(module_path)
@@ -95,12 +97,9 @@ class UKBinCollectionApp:
         """Parse the arguments from the command line."""
         self.parsed_args = self.parser.parse_args(args)
 
-    def run(self):
-        """Run the application with the provided arguments."""
-        council_module = import_council_module(self.parsed_args.module)
-        return self.client_code(
-            council_module.CouncilClass(),
-            self.parsed_args.URL,
+    def council_kwargs(self):
+        """Build the keyword arguments passed to the council class."""
+        return dict(
             postcode=self.parsed_args.postcode,
             paon=self.parsed_args.number,
             uprn=self.parsed_args.uprn,
@@ -112,6 +111,23 @@ class UKBinCollectionApp:
             council_module_str=self.parsed_args.module,
         )
 
+    def run(self):
+        """Run the application with the provided arguments."""
+        council_module = import_council_module(self.parsed_args.module)
+        return self.client_code(
+            council_module.CouncilClass(),
+            self.parsed_args.URL,
+            **self.council_kwargs(),
+        )
+
+    def get_bin_data(self):
+        """Run the council scraper and return its parsed data as a dict,
+        without the JSON encoding (or dev mode update) that run() does."""
+        council_module = import_council_module(self.parsed_args.module)
+        return council_module.CouncilClass().get_and_parse_data(
+            self.parsed_args.URL, **self.council_kwargs()
+        )
+
     def client_code(self, get_bin_data_class, address_url, **kwargs):
         """
         Call the template method to execute the algorithm. Client code does not need
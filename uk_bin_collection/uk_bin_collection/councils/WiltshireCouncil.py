@@ -1,11 +1,61 @@
-import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from bs4 import BeautifulSoup
+import lxml.html
+from lxml import etree
 import requests
+from requests.adapters import HTTPAdapter
 
 from uk_bin_collection.uk_bin_collection.common import *
 from uk_bin_collection.uk_bin_collection.get_bin_data import AbstractGetBinDataClass
 
+_URL = "https://ilambassadorformsprod.azurewebsites.net/wastecollectiondays/wastecollectioncalendar"
+
+# Request headers and cookies, set once on a shared session so each month's
+# POST reuses them (and its connections) rather than rebuilding them per call
+_COOKIES = {
+    "ARRAffinity": "c5a9db7fe43cef907f06528c3d34a997365656f757206fbdf34193e2c3b6f737",
+    "ARRAffinitySameSite": "c5a9db7fe43cef907f06528c3d34a997365656f757206fbdf34193e2c3b6f737",
+}
+_HEADERS = {
+    "Accept": "*/*",
+    "Accept-Language": "en-GB,en;q=0.9",
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
+    # 'Cookie': 'ARRAffinity=c5a9db7fe43cef907f06528c3d34a997365656f757206fbdf34193e2c3b6f737; ARRAffinitySameSite=c5a9db7fe43cef907f06528c3d34a997365656f757206fbdf34193e2c3b6f737',
+    "Origin": "https://ilambassadorformsprod.azurewebsites.net",
+    "Pragma": "no-cache",
+    "Referer": "https://ilambassadorformsprod.azurewebsites.net/wastecollectiondays/index",
+    "Sec-Fetch-Dest": "empty",
+    "Sec-Fetch-Mode": "cors",
+    "Sec-Fetch-Site": "same-origin",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/112.0.0.0 Safari/537.36 OPR/98.0.0.0",
+    "X-Requested-With": "XMLHttpRequest",
+    "sec-ch-ua": '"Chromium";v="112", "Not_A Brand";v="24", "Opera GX";v="98"',
+    "sec-ch-ua-mobile": "?0",
+    "sec-ch-ua-platform": '"Windows"',
+}
+
+_SESSION = requests.Session()
+_SESSION.headers.update(_HEADERS)
+_SESSION.cookies.update(_COOKIES)
+# One connection per month, so all twelve requests can run at once
+_SESSION.mount("https://", HTTPAdapter(pool_maxsize=12))
+
+
+def _has_class(name):
+    """XPath test for an element whose class list includes `name`."""
+    return f'contains(concat(" ", normalize-space(@class), " "), " {name} ")'
+
+
+# Compiled once: the calendar days holding at least one collection, and from
+# each, its date and the first collection-type label
+_EVENT_DAYS = etree.XPath(
+    f'//div[{_has_class("cal-inner")}][.//div[{_has_class("events-list")}]]'
+)
+_DAY_DATE = etree.XPath(f'(.//span[{_has_class("day-no")}])[1]/@data-cal-date')
+_EVENT_LABEL = etree.XPath(f'(.//*[{_has_class("rc-event-container")}]//span)[1]')
+
 
 class CouncilClass(AbstractGetBinDataClass):
     """
@@ -35,22 +85,6 @@ class CouncilClass(AbstractGetBinDataClass):
         """
         requests.packages.urllib3.disable_warnings()
         
-        # Define 12 months to get from the calendar (Rolling 12 Months)
-        months_to_fetch = []
-        current_date = datetime.now()
-        start_month = current_date.month
-        start_year = current_date.year
-
-        for i in range(12):
-            # Calculate month and year for this iteration
-            # (month - 1) + i gives a 0-indexed offset.
-            # % 12 gives 0-11 range. + 1 converts back to 1-12.
-            m = (start_month - 1 + i) % 12 + 1
-            # Calculate year increment. 
-            # If start_month + i > 12, we are in next year(s)
-            y = start_year + ((start_month - 1 + i) // 12)
-            months_to_fetch.append((m, y))
-
         # Get and check the postcode and UPRN values
         user_postcode = kwargs.get("postcode")
         check_postcode(user_postcode)
@@ -58,36 +92,17 @@ class CouncilClass(AbstractGetBinDataClass):
         check_uprn(user_uprn)
         user_uprn = str(user_uprn).zfill(12)
 
-        # Some data for the request
-        cookies = {
-            "ARRAffinity": "c5a9db7fe43cef907f06528c3d34a997365656f757206fbdf34193e2c3b6f737",
-            "ARRAffinitySameSite": "c5a9db7fe43cef907f06528c3d34a997365656f757206fbdf34193e2c3b6f737",
-        }
-        headers = {
-            "Accept": "*/*",
-            "Accept-Language": "en-GB,en;q=0.9",
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
-            # 'Cookie': 'ARRAffinity=c5a9db7fe43cef907f06528c3d34a997365656f757206fbdf34193e2c3b6f737; ARRAffinitySameSite=c5a9db7fe43cef907f06528c3d34a997365656f757206fbdf34193e2c3b6f737',
-            "Origin": "https://ilambassadorformsprod.azurewebsites.net",
-            "Pragma": "no-cache",
-            "Referer": "https://ilambassadorformsprod.azurewebsites.net/wastecollectiondays/index",
-            "Sec-Fetch-Dest": "empty",
-            "Sec-Fetch-Mode": "cors",
-            "Sec-Fetch-Site": "same-origin",
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/112.0.0.0 Safari/537.36 OPR/98.0.0.0",
-            "X-Requested-With": "XMLHttpRequest",
-            "sec-ch-ua": '"Chromium";v="112", "Not_A Brand";v="24", "Opera GX";v="98"',
-            "sec-ch-ua-mobile": "?0",
-            "sec-ch-ua-platform": '"Windows"',
-        }
+        # Define 12 months to get from the calendar (Rolling 12 Months), as
+        # (month, year). Each offset counts months from January of this year.
+        current_date = datetime.now()
+        months_to_fetch = [
+            (offset % 12 + 1, current_date.year + offset // 12)
+            for offset in range(current_date.month - 1, current_date.month + 11)
+        ]
 
-        data_bins = {"bins": []}
+        def fetch_month(month_year):
+            cal_month, cal_year = month_year
 
-        # For each of the months we defined
-        for cal_month, cal_year in months_to_fetch:
-            
             # Data for the calendar
             data = {
                 "Month": cal_month,
@@ -98,16 +113,13 @@ class CouncilClass(AbstractGetBinDataClass):
 
             # Send it all as a POST
             try:
-                response = requests.post(
-                    "https://ilambassadorformsprod.azurewebsites.net/wastecollectiondays/wastecollectioncalendar",
-                    cookies=cookies,
-                    headers=headers,
+                response = _SESSION.post(
+                    _URL,
                     data=data,
                     timeout=10 # Added timeout for safety
                 )
             except Exception as e:
-                 # If one month fails, log it but try to continue or re-raise
-                 # For now, we'll re-raise to signal failure
+                 # If one month fails, re-raise to signal failure
                  raise SystemError(f"Connection failed for {cal_month}/{cal_year}: {e}")
 
             # If we don't get a HTTP200, throw an error
@@ -115,44 +127,68 @@ class CouncilClass(AbstractGetBinDataClass):
                 raise SystemError(
                     f"Error retrieving data for {cal_month}/{cal_year}! Status: {response.status_code}"
                 )
+            return response.content
+
+        # The months don't depend on each other, so request them all at once
+        # over the keep-alive session rather than one after another.
+        # executor.map keeps the pages in month order.
+        with ThreadPoolExecutor(max_workers=len(months_to_fetch)) as executor:
+            pages = list(executor.map(fetch_month, months_to_fetch))
+
+        data_bins = {"bins": []}
+        # (type, date) pairs already added, for O(1) duplicate checks
+        seen = set()
+        # data-cal-date value -> formatted date; days repeat across overlapping
+        # month views, so each is only parsed once
+        formatted_dates = {}
+
+        # For each of the months we defined
+        for page_content in pages:
+            if not page_content.strip():
+                continue
+            try:
+                tree = lxml.html.fromstring(page_content)
+            except etree.ParserError:
+                # e.g. a body holding only a comment: no calendar this month
+                continue
 
-            soup = BeautifulSoup(response.text, features="html.parser")
-            soup.prettify()
             # Find all the bits of the current calendar that contain an event
-            resultscontainer = soup.find_all("div", {"class": "cal-inner"})
-
-            for result in resultscontainer:
-                event = result.find("div", {"class": "events-list"})
-                if event:
-                    try:
-                        date_span = result.find("span", class_="day-no")
-                        if not date_span or "data-cal-date" not in date_span.attrs:
-                            continue
-
-                        collectiondate = datetime.strptime(
-                            date_span["data-cal-date"],
-                            "%Y-%m-%dT%H:%M:%S",
+            for result in _EVENT_DAYS(tree):
+                try:
+                    date_attr = _DAY_DATE(result)
+                    if not date_attr:
+                        continue
+
+                    collectiondate = formatted_dates.get(date_attr[0])
+                    if collectiondate is None:
+                        # ISO 8601 ("%Y-%m-%dT%H:%M:%S"): fromisoformat is
+                        # much cheaper than strptime
+                        collectiondate = datetime.fromisoformat(
+                            date_attr[0]
                         ).strftime(date_format)
+                        formatted_dates[date_attr[0]] = collectiondate
+                    
+                    collection_type_element = _EVENT_LABEL(result)
+                    if not collection_type_element:
+                        continue
                         
-                        collection_type_element = result.select_one(".rc-event-container span")
-                        if not collection_type_element:
-                            continue
+                    collection_type = collection_type_element[0].text_content().strip()
+
+                    collection_types = collection_type.split(" and ")
+
+                    for type in collection_types:
+                        # Check for duplicates before adding (just in case overlapping requests occur)
+                        if (type, collectiondate) not in seen:
+                            seen.add((type, collectiondate))
+                            data_bins["bins"].append(
+                                {
+                                    "type": type,
+                                    "collectionDate": collectiondate,
+                                }
+                            )
                             
-                        collection_type = collection_type_element.text.strip()
-
-                        collection_types = collection_type.split(" and ")
-
-                        for type in collection_types:
-                            dict_data = {
-                                "type": type,
-                                "collectionDate": collectiondate,
-                            }
-                            # Check for duplicates before adding (just in case overlapping requests occur)
-                            if dict_data not in data_bins["bins"]:
-                                data_bins["bins"].append(dict_data)
-                                
-                    except Exception as e:
-                        # Skip this specific entry if parsing fails, but continue with others
-                        continue
+                except Exception as e:
+                    # Skip this specific entry if parsing fails, but continue with others
+                    continue
 
         return data_bins